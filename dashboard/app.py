@@ -3,9 +3,12 @@
 # Copy/paste this whole file.
 #
 # Requirements:
-#   streamlit, pandas, psycopg[binary], plotly
+#   streamlit, pandas, psycopg[binary], psycopg_pool, plotly, joblib
+#   optional: numba (JIT for the simulator's numeric helpers; cached on disk via cache=True)
 # Env vars:
 #   DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
+#   optional: DB_POOL_MAX_SIZE (default 8)
+#   optional: GRID_SEARCH_N_JOBS (grid-search worker processes, joblib semantics; default -1 = all cores)
 #
 # Notes:
 # - This file assumes you have these tables/constraints:
@@ -23,15 +26,23 @@ import os
 import math
 import re
 from datetime import date, datetime, timedelta, timezone
-from itertools import product
 from typing import Sequence, Literal, Tuple, Callable
 from zoneinfo import ZoneInfo
 
 import numpy as np
 import pandas as pd
-import psycopg
+from psycopg_pool import ConnectionPool
 import streamlit as st
 import plotly.express as px
+from joblib import Parallel, delayed, effective_n_jobs
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the simulator runs as plain NumPy/Python without it.
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
 
 # -----------------------------
 # Page config
@@ -43,8 +54,38 @@ DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "appdb")
 DB_USER = os.getenv("DB_USER", "appuser")
 DB_PASS = os.getenv("DB_PASS", "")
+DB_POOL_MAX_SIZE = max(1, int(os.getenv("DB_POOL_MAX_SIZE", "8")))
+
+# Grids smaller than this run in-process; see run_grid_search.
+GRID_PARALLEL_MIN_COMBOS = 32
+GRID_SEARCH_N_JOBS = int(os.getenv("GRID_SEARCH_N_JOBS", "-1"))
+
+# Simulator trade log rows; action indexes TRADE_ACTIONS.
+TRADE_BUY = 0
+TRADE_SELL = 1
+TRADE_ACTIONS = ("BUY", "SELL")
+TRADE_DTYPE = np.dtype(
+    [
+        ("day_idx", "i4"),
+        ("ticker_id", "i4"),
+        ("action", "i1"),
+        ("price", "f8"),
+        ("shares", "f8"),
+        ("order_usd", "f8"),
+        ("proceeds_net", "f8"),
+        ("cash_before", "f8"),
+        ("cash_after", "f8"),
+        ("shares_after", "f8"),
+        ("signal_return_pct", "f8"),
+        ("signal_window_days", "i4"),
+    ]
+)
 
 WeightMethod = Literal["equal", "market_cap"]
+# (price_mat, valid_mask, dt_index, gap_days) as built by _prepare_panel.
+PreparedPanel = Tuple[np.ndarray, np.ndarray, list, np.ndarray]
+# "full" records trades/equity for the UI; "summary" returns only what grid ranking needs.
+SimReturnMode = Literal["full", "summary"]
 CHART_COLORS = [
     "#355B8E",
     "#4C6A92",
@@ -642,16 +683,22 @@ def style_figure(fig, title: str | None = None):
 # DB helpers
 # -----------------------------
 @st.cache_resource
-def get_conn():
-    # Note: cached connection is fine for light usage.
-    # If you hit "connection closed" errors, we can switch to a pool.
-    return psycopg.connect(
-        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASS
+def get_pool() -> ConnectionPool:
+    # One pool per server process: concurrent sessions borrow their own connection
+    # instead of serializing on a single cached one, and a connection that was
+    # closed server-side is replaced on checkout instead of failing the query.
+    return ConnectionPool(
+        kwargs={"host": DB_HOST, "port": DB_PORT, "dbname": DB_NAME, "user": DB_USER, "password": DB_PASS},
+        min_size=1,
+        max_size=DB_POOL_MAX_SIZE,
+        check=ConnectionPool.check_connection,
+        open=True,
     )
 
 
 def qdf(sql: str, params=None) -> pd.DataFrame:
-    with get_conn().cursor() as cur:
+    # The pooled connection commits (ends the read transaction) when it is returned.
+    with get_pool().connection() as conn, conn.cursor() as cur:
         cur.execute(sql, params or ())
         rows = cur.fetchall()
         cols = [d.name for d in cur.description]
@@ -1374,7 +1421,39 @@ def fetch_close_panel(tickers: Sequence[str], start_dt, end_dt) -> pd.DataFrame:
     return panel
 
 
-def run_threshold_simulation(
+@st.cache_data(ttl=900, max_entries=16, show_spinner=False)
+def fetch_close_panel_cached(tickers: tuple[str, ...], start_dt, end_dt) -> pd.DataFrame:
+    # Streamlit reruns the whole script on every widget change; keep the panel across reruns.
+    # The TTL stays below the hourly updater cadence so new closes show up promptly.
+    return fetch_close_panel(list(tickers), start_dt, end_dt)
+
+
+def _prepare_panel(price_panel: pd.DataFrame, tickers: Sequence[str]) -> PreparedPanel:
+    """
+    Aligns the wide close panel to the simulated tickers once so the day loop can use
+    plain ndarray indexing. Columns follow sorted ticker order, the order the simulator
+    walks them in. Tickers missing from the panel become all-NaN columns.
+
+    gap_days[i] is the calendar gap (in days) between row i-1 and row i, used to accrue
+    cash interest without per-day Timestamp arithmetic.
+    """
+    aligned = price_panel.reindex(columns=sorted(tickers))
+    price_mat = aligned.to_numpy(dtype=np.float64)
+    valid_mask = ~np.isnan(price_mat)
+    dt_index = list(aligned.index)
+    gap_days = np.zeros(len(dt_index), dtype=np.float64)
+    if len(dt_index) > 1:
+        dt_ns = aligned.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        gap_days[1:] = np.maximum(np.diff(dt_ns) / 86_400e9, 0.0)
+    # Read-only: the simulator never mutates the panel, and grid workers receive these
+    # as shared read-only memmaps, so in-process runs should behave the same way.
+    for arr in (price_mat, valid_mask, gap_days):
+        arr.setflags(write=False)
+    return price_mat, valid_mask, dt_index, gap_days
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_threshold_simulation_cached(
     price_panel: pd.DataFrame,
     buy_unit_by_ticker: dict[str, float],
     starting_cash: float,
@@ -1389,195 +1468,371 @@ def run_threshold_simulation(
     fee_bps: float,
     allow_reentry: bool,
 ) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    tickers = list(buy_unit_by_ticker.keys())
-    fee_buy = 1.0 + (fee_bps / 10000.0)
-    fee_sell = 1.0 - (fee_bps / 10000.0)
-    annual_cash_yield = float(max(0.0, annual_cash_yield_pct)) / 100.0
-    annual_borrow_rate = float(max(0.0, annual_borrow_rate_pct)) / 100.0
-
-    cash_balance = float(max(0.0, starting_cash))
-    state = {
-        t: {
-            "shares": 0.0,
-            "last_price": None,
-            "buy_count": 0,
-            "sell_count": 0,
-            "history": [],
-            "notional_bought": 0.0,
-            "proceeds_sold": 0.0,
+    # Grid-search widgets rerun the page; reuse the single simulation when its inputs are unchanged.
+    return run_threshold_simulation(
+        price_panel=price_panel,
+        buy_unit_by_ticker=buy_unit_by_ticker,
+        starting_cash=starting_cash,
+        annual_cash_yield_pct=annual_cash_yield_pct,
+        annual_borrow_rate_pct=annual_borrow_rate_pct,
+        allow_leverage=allow_leverage,
+        buy_threshold_pct=buy_threshold_pct,
+        buy_window_days=buy_window_days,
+        sell_threshold_pct=sell_threshold_pct,
+        sell_window_days=sell_window_days,
+        sell_mode=sell_mode,
+        fee_bps=fee_bps,
+        allow_reentry=allow_reentry,
+    )
+
+
+@njit(cache=True)
+def _window_returns(price_mat: np.ndarray, valid_mask: np.ndarray, window: int) -> np.ndarray:
+    """
+    Percent return over the last `window` observed closes for every (day, ticker) cell,
+    NaN until a ticker has more than `window` closes. Gaps are skipped, so the window
+    counts trading observations rather than calendar rows.
+
+    Returns are stored as float32: they only feed threshold comparisons and the trade
+    log, and halving the matrix keeps the day loop's reads cache-friendly. Prices,
+    shares and cash stay float64 for the accounting.
+    """
+    out = np.full(price_mat.shape, np.nan, dtype=np.float32)
+    for j in range(price_mat.shape[1]):
+        rows = np.flatnonzero(valid_mask[:, j])
+        if rows.size <= window:
+            continue
+        closes = price_mat[rows, j]
+        out[rows[window:], j] = ((closes[window:] / closes[: closes.size - window]) - 1.0) * 100.0
+    return out
+
+
+def _trades_frame(trades: np.ndarray, tickers: Sequence[str], dt_index: Sequence[pd.Timestamp]) -> pd.DataFrame:
+    if trades.size == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(
+        {
+            "dt": pd.DatetimeIndex(dt_index)[trades["day_idx"]],
+            "ticker": np.asarray(tickers, dtype=object)[trades["ticker_id"]],
+            "action": np.asarray(TRADE_ACTIONS, dtype=object)[trades["action"]],
+            "price": trades["price"],
+            "shares": trades["shares"],
+            "order_usd": trades["order_usd"],
+            "proceeds_net": trades["proceeds_net"],
+            "cash_before": trades["cash_before"],
+            "cash_after": trades["cash_after"],
+            "shares_after": trades["shares_after"],
+            "signal_return_pct": trades["signal_return_pct"],
+            "signal_window_days": trades["signal_window_days"],
         }
-        for t in tickers
-    }
+    )
 
-    trades: list[dict] = []
-    equity_curve: list[dict] = []
 
-    def buy_one_unit(ticker: str, dt, price: float, signal_ret: float | None, signal_window: int):
-        nonlocal cash_balance
-        stt = state[ticker]
-        unit_usd = float(buy_unit_by_ticker[ticker])
-        if unit_usd <= 0:
-            return
-        if (not allow_leverage) and cash_balance < unit_usd:
-            return
+def run_threshold_simulation(
+    price_panel: pd.DataFrame,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    buy_threshold_pct: float,
+    buy_window_days: int,
+    sell_threshold_pct: float,
+    sell_window_days: int,
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    tickers = sorted(buy_unit_by_ticker)
+    prepared = _prepare_panel(price_panel, tickers)
+    trades, final_rows, equity = _simulate_prepared(
+        prepared,
+        buy_unit_by_ticker=buy_unit_by_ticker,
+        starting_cash=starting_cash,
+        annual_cash_yield_pct=annual_cash_yield_pct,
+        annual_borrow_rate_pct=annual_borrow_rate_pct,
+        allow_leverage=allow_leverage,
+        buy_threshold_pct=buy_threshold_pct,
+        buy_window_days=buy_window_days,
+        sell_threshold_pct=sell_threshold_pct,
+        sell_window_days=sell_window_days,
+        sell_mode=sell_mode,
+        fee_bps=fee_bps,
+        allow_reentry=allow_reentry,
+    )
+    dt_index = prepared[2]
 
-        cash_before = cash_balance
-        cash_balance -= unit_usd
-        shares_bought = (unit_usd / fee_buy) / price
-        stt["shares"] += shares_bought
-        stt["buy_count"] += 1
-        stt["notional_bought"] += unit_usd
+    # Trades are emitted day by day in sorted ticker order, at most one per (dt, ticker),
+    # so the log is already ordered by dt/ticker/action.
+    trades_df = _trades_frame(trades, tickers, dt_index)
 
-        trades.append(
+    equity_df = pd.DataFrame()
+    if dt_index:
+        # Dict of preallocated float64 columns: no per-row dtype inference.
+        equity_df = pd.DataFrame(
             {
-                "dt": dt,
-                "ticker": ticker,
-                "action": "BUY",
-                "price": price,
-                "shares": shares_bought,
-                "order_usd": unit_usd,
-                "cash_before": cash_before,
-                "cash_after": cash_balance,
-                "shares_after": stt["shares"],
-                "signal_return_pct": signal_ret,
-                "signal_window_days": signal_window,
+                "dt": pd.DatetimeIndex(dt_index).values,
+                "cash_balance": equity["cash_balance"],
+                "portfolio_value": equity["portfolio_value"],
+                "deployed_value": equity["portfolio_value"],
+                "total_wealth": equity["total_wealth"],
             }
         )
 
-    prev_dt = None
-    for dt, row in price_panel.iterrows():
-        if prev_dt is not None:
-            days_delta = max(0.0, (dt - prev_dt).total_seconds() / 86400.0)
-            if days_delta > 0 and cash_balance > 0 and annual_cash_yield > 0:
-                cash_balance *= (1.0 + annual_cash_yield) ** (days_delta / 365.0)
-            elif days_delta > 0 and cash_balance < 0 and annual_borrow_rate > 0:
-                # Negative cash represents borrowed funds; debt grows with borrow interest.
-                cash_balance *= (1.0 + annual_borrow_rate) ** (days_delta / 365.0)
-        prev_dt = dt
-
-        for ticker in tickers:
-            px = row.get(ticker)
-            stt = state[ticker]
-
-            if pd.isna(px):
-                continue
+    final_df = pd.DataFrame(final_rows).sort_values("position_value", ascending=False).reset_index(drop=True)
+    return trades_df, final_df, equity_df
 
-            price = float(px)
-            stt["last_price"] = price
-            stt["history"].append(price)
-            hist = stt["history"]
-
-            buy_ret = None
-            sell_ret = None
-            if len(hist) > buy_window_days:
-                buy_ret = ((hist[-1] / hist[-1 - buy_window_days]) - 1.0) * 100.0
-            if len(hist) > sell_window_days:
-                sell_ret = ((hist[-1] / hist[-1 - sell_window_days]) - 1.0) * 100.0
-
-            if stt["shares"] <= 0:
-                can_reenter = allow_reentry or stt["buy_count"] == 0
-                buy_signal = buy_ret is not None and buy_ret >= buy_threshold_pct
-                if can_reenter and buy_signal:
-                    buy_one_unit(ticker, dt, price, buy_ret, buy_window_days)
-            else:
-                sell_signal = False
-                if sell_ret is not None:
-                    if sell_mode == "Sell on drop":
-                        sell_signal = sell_ret <= -abs(sell_threshold_pct)
-                    else:
-                        sell_signal = sell_ret >= abs(sell_threshold_pct)
-
-                buy_signal = buy_ret is not None and buy_ret >= buy_threshold_pct
-                if sell_signal:
-                    shares_before = stt["shares"]
-                    cash_before = cash_balance
-                    gross = shares_before * price
-                    net = gross * fee_sell
-                    cash_balance = cash_before + net
-                    stt["shares"] = 0.0
-                    stt["sell_count"] += 1
-                    stt["proceeds_sold"] += net
-                    trades.append(
-                        {
-                            "dt": dt,
-                            "ticker": ticker,
-                            "action": "SELL",
-                            "price": price,
-                            "shares": shares_before,
-                            "proceeds_net": net,
-                            "cash_before": cash_before,
-                            "cash_after": cash_balance,
-                            "shares_after": stt["shares"],
-                            "signal_return_pct": sell_ret,
-                            "signal_window_days": sell_window_days,
-                        }
+
+@njit(cache=True)
+def _buy_unit(
+    j, i, price, signal_ret, unit_usd, cash, allow_leverage, fee_buy,
+    shares, buy_count, notional_bought, record, n_trades, t_day, t_tid, t_action, t_vals,
+):
+    # Returns the updated (cash, n_trades); a skipped buy leaves both unchanged.
+    if unit_usd <= 0.0:
+        return cash, n_trades
+    if (not allow_leverage) and cash < unit_usd:
+        return cash, n_trades
+
+    cash_before = cash
+    cash -= unit_usd
+    shares_bought = (unit_usd / fee_buy) / price
+    shares[j] += shares_bought
+    buy_count[j] += 1
+    notional_bought[j] += unit_usd
+    if record:
+        t_day[n_trades] = i
+        t_tid[n_trades] = j
+        t_action[n_trades] = TRADE_BUY
+        t_vals[n_trades, 0] = price
+        t_vals[n_trades, 1] = shares_bought
+        t_vals[n_trades, 2] = unit_usd
+        t_vals[n_trades, 3] = np.nan
+        t_vals[n_trades, 4] = cash_before
+        t_vals[n_trades, 5] = cash
+        t_vals[n_trades, 6] = shares[j]
+        t_vals[n_trades, 7] = signal_ret
+    return cash, n_trades + 1
+
+
+@njit(cache=True)
+def _simulate_kernel(
+    price_mat, valid_mask, gap_days, buy_ret_mat, sell_ret_mat, unit_usd,
+    starting_cash, annual_cash_yield, annual_borrow_rate, allow_leverage,
+    buy_threshold_pct, sell_sign, abs_sell_threshold, fee_buy, fee_sell, allow_reentry, record,
+):
+    """
+    Day loop of the threshold simulator over day-major arrays. Per-ticker state lives in
+    parallel arrays (column j); with record=False only the summary scalars are kept.
+    Trades come back as columns: t_vals holds price, shares, order_usd, proceeds_net,
+    cash_before, cash_after, shares_after and signal_return_pct.
+    """
+    n_days, n_tickers = price_mat.shape
+    shares = np.zeros(n_tickers)
+    # 0.0 until a ticker's first close, which is also what an unpriced position is worth.
+    last_price = np.zeros(n_tickers)
+    buy_count = np.zeros(n_tickers, dtype=np.int64)
+    sell_count = np.zeros(n_tickers, dtype=np.int64)
+    notional_bought = np.zeros(n_tickers)
+    proceeds_sold = np.zeros(n_tickers)
+
+    # A ticker trades at most once per day, so days * tickers bounds the log size.
+    max_trades = n_days * n_tickers if record else 0
+    t_day = np.empty(max_trades, dtype=np.int32)
+    t_tid = np.empty(max_trades, dtype=np.int32)
+    t_action = np.empty(max_trades, dtype=np.int8)
+    t_vals = np.empty((max_trades, 8))
+    n_trades = 0
+    n_eq = n_days if record else 0
+    cash_out = np.empty(n_eq)
+    inv_out = np.empty(n_eq)
+    total_out = np.empty(n_eq)
+
+    cash = starting_cash
+    invested = 0.0
+    total = cash
+    running_max = -np.inf
+    min_dd = 0.0
+    has_dd = False
+    for i in range(n_days):
+        days_delta = gap_days[i]
+        if days_delta > 0 and cash > 0 and annual_cash_yield > 0:
+            cash *= (1.0 + annual_cash_yield) ** (days_delta / 365.0)
+        elif days_delta > 0 and cash < 0 and annual_borrow_rate > 0:
+            # Negative cash represents borrowed funds; debt grows with borrow interest.
+            cash *= (1.0 + annual_borrow_rate) ** (days_delta / 365.0)
+
+        for j in range(n_tickers):
+            if not valid_mask[i, j]:
+                continue
+            price = price_mat[i, j]
+            last_price[j] = price
+            # NaN (not enough history yet) compares False, so it never signals.
+            buy_ret = buy_ret_mat[i, j]
+            sell_ret = sell_ret_mat[i, j]
+
+            if shares[j] <= 0:
+                if (allow_reentry or buy_count[j] == 0) and buy_ret >= buy_threshold_pct:
+                    cash, n_trades = _buy_unit(
+                        j, i, price, buy_ret, unit_usd[j], cash, allow_leverage, fee_buy,
+                        shares, buy_count, notional_bought, record, n_trades, t_day, t_tid, t_action, t_vals,
                     )
-                elif buy_signal:
-                    # Pyramiding behavior: keep adding one unit while trend remains valid.
-                    buy_one_unit(ticker, dt, price, buy_ret, buy_window_days)
-
-        invested_value = 0.0
-        for ticker in tickers:
-            stt = state[ticker]
-            last_px = stt["last_price"] if stt["last_price"] is not None else 0.0
-            position_value = stt["shares"] * last_px
-            invested_value += position_value
-        total_wealth = cash_balance + invested_value
-        equity_curve.append(
-            {
-                "dt": dt,
-                "cash_balance": cash_balance,
-                "portfolio_value": invested_value,
-                "deployed_value": invested_value,
-                "total_wealth": total_wealth,
-            }
-        )
+            elif (sell_ret * sell_sign) >= abs_sell_threshold:
+                shares_before = shares[j]
+                cash_before = cash
+                net = shares_before * price * fee_sell
+                cash = cash_before + net
+                shares[j] = 0.0
+                sell_count[j] += 1
+                proceeds_sold[j] += net
+                if record:
+                    t_day[n_trades] = i
+                    t_tid[n_trades] = j
+                    t_action[n_trades] = TRADE_SELL
+                    t_vals[n_trades, 0] = price
+                    t_vals[n_trades, 1] = shares_before
+                    t_vals[n_trades, 2] = np.nan
+                    t_vals[n_trades, 3] = net
+                    t_vals[n_trades, 4] = cash_before
+                    t_vals[n_trades, 5] = cash
+                    t_vals[n_trades, 6] = 0.0
+                    t_vals[n_trades, 7] = sell_ret
+                n_trades += 1
+            elif buy_ret >= buy_threshold_pct:
+                # Pyramiding behavior: keep adding one unit while trend remains valid.
+                cash, n_trades = _buy_unit(
+                    j, i, price, buy_ret, unit_usd[j], cash, allow_leverage, fee_buy,
+                    shares, buy_count, notional_bought, record, n_trades, t_day, t_tid, t_action, t_vals,
+                )
+
+        invested = (shares * last_price).sum()
+        total = cash + invested
+        if record:
+            cash_out[i] = cash
+            inv_out[i] = invested
+            total_out[i] = total
+        # Drawdown folded into the day loop; a zero peak has no defined ratio.
+        running_max = max(running_max, total)
+        if running_max != 0:
+            dd = total / running_max - 1.0
+            if not has_dd or dd < min_dd:
+                min_dd = dd
+            has_dd = True
+
+    return (
+        cash, invested, total, min_dd, has_dd, n_trades,
+        shares, last_price, buy_count, sell_count, notional_bought, proceeds_sold,
+        t_day[:n_trades], t_tid[:n_trades], t_action[:n_trades], t_vals[:n_trades],
+        cash_out, inv_out, total_out,
+    )
+
+
+def _simulate_prepared(
+    prepared: PreparedPanel,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    buy_threshold_pct: float,
+    buy_window_days: int,
+    sell_threshold_pct: float,
+    sell_window_days: int,
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+    return_mode: SimReturnMode = "full",
+    window_returns: dict[int, np.ndarray] | None = None,
+) -> tuple[np.ndarray, list[dict], dict[str, np.ndarray]] | dict:
+    # Same-day buys compete for cash when leverage is off; walk tickers in a fixed
+    # (sorted) order so results do not depend on selection order.
+    tickers = sorted(buy_unit_by_ticker)
+    price_mat, valid_mask, _, gap_days = prepared
+    full = return_mode == "full"
+
+    # Grid searches pass in one return matrix per distinct window; compute any that are missing.
+    ret_by_window = dict(window_returns or {})
+    for window in {int(buy_window_days), int(sell_window_days)}:
+        if window not in ret_by_window:
+            ret_by_window[window] = _window_returns(price_mat, valid_mask, window)
+    buy_ret_mat = ret_by_window[int(buy_window_days)]
+    sell_ret_mat = ret_by_window[int(sell_window_days)]
+
+    (
+        cash_balance, invested_value, total_wealth, min_dd, has_dd, n_trades,
+        shares_arr, last_price_arr, buy_count, sell_count, notional_bought, proceeds_sold,
+        t_day, t_tid, t_action, t_vals,
+        cash_out, inv_out, total_out,
+    ) = _simulate_kernel(
+        price_mat,
+        valid_mask,
+        gap_days,
+        buy_ret_mat,
+        sell_ret_mat,
+        np.array([float(buy_unit_by_ticker[t]) for t in tickers], dtype=np.float64),
+        float(max(0.0, starting_cash)),
+        float(max(0.0, annual_cash_yield_pct)) / 100.0,
+        float(max(0.0, annual_borrow_rate_pct)) / 100.0,
+        bool(allow_leverage),
+        float(buy_threshold_pct),
+        # "Sell on drop" fires when ret <= -thr, i.e. -ret >= thr; fold the mode into a sign.
+        -1.0 if sell_mode == "Sell on drop" else 1.0,
+        abs(float(sell_threshold_pct)),
+        1.0 + (fee_bps / 10000.0),
+        1.0 - (fee_bps / 10000.0),
+        bool(allow_reentry),
+        full,
+    )
+
+    if not full:
+        has_days = len(gap_days) > 0
+        return {
+            "final_cash": float(cash_balance) if has_days else None,
+            "final_invested": float(invested_value) if has_days else None,
+            "final_total_wealth": float(total_wealth) if has_days else None,
+            "max_drawdown_pct": float(min_dd) * 100.0 if has_dd else None,
+            "trade_count": int(n_trades),
+        }
+
+    trades = np.empty(int(n_trades), dtype=TRADE_DTYPE)
+    trades["day_idx"] = t_day
+    trades["ticker_id"] = t_tid
+    trades["action"] = t_action
+    for k, field in enumerate(
+        ("price", "shares", "order_usd", "proceeds_net", "cash_before", "cash_after", "shares_after", "signal_return_pct")
+    ):
+        trades[field] = t_vals[:, k]
+    trades["signal_window_days"] = np.where(t_action == TRADE_BUY, int(buy_window_days), int(sell_window_days))
 
     final_rows: list[dict] = []
-    for ticker in tickers:
-        stt = state[ticker]
-        last_px = stt["last_price"] if stt["last_price"] is not None else 0.0
-        position_value = stt["shares"] * last_px
+    for j, ticker in enumerate(tickers):
+        last_px = float(last_price_arr[j])
+        shares = float(shares_arr[j])
         unit_usd = float(buy_unit_by_ticker[ticker])
         final_rows.append(
             {
                 "ticker": ticker,
                 "buy_unit_usd": unit_usd,
                 "last_price": last_px,
-                "ending_shares": stt["shares"],
-                "position_value": position_value,
-                "notional_bought": stt["notional_bought"],
-                "proceeds_sold": stt["proceeds_sold"],
-                "net_flow": stt["proceeds_sold"] - stt["notional_bought"],
-                "buys": stt["buy_count"],
-                "sells": stt["sell_count"],
+                "ending_shares": shares,
+                "position_value": shares * last_px,
+                "notional_bought": float(notional_bought[j]),
+                "proceeds_sold": float(proceeds_sold[j]),
+                "net_flow": float(proceeds_sold[j] - notional_bought[j]),
+                "buys": int(buy_count[j]),
+                "sells": int(sell_count[j]),
             }
         )
 
-    trades_df = pd.DataFrame(trades)
-    if not trades_df.empty:
-        trades_df["dt"] = pd.to_datetime(trades_df["dt"])
-        trades_df = trades_df.sort_values(["dt", "ticker", "action"]).reset_index(drop=True)
-
-    equity_df = pd.DataFrame(equity_curve)
-    if not equity_df.empty:
-        equity_df["dt"] = pd.to_datetime(equity_df["dt"])
-
-    final_df = pd.DataFrame(final_rows).sort_values("position_value", ascending=False).reset_index(drop=True)
-    return trades_df, final_df, equity_df
+    equity = {"cash_balance": cash_out, "portfolio_value": inv_out, "total_wealth": total_out}
+    return trades, final_rows, equity
 
 
 def build_float_grid(start: float, end: float, step: float) -> list[float]:
     if step <= 0:
         return [float(start)]
-    vals: list[float] = []
-    x = float(start)
-    guard = 0
-    while x <= float(end) + 1e-9 and guard < 5000:
-        vals.append(round(x, 6))
-        x += float(step)
-        guard += 1
-    return vals
+    # arange computes start + i * step, so it does not accumulate float error like repeated +=.
+    return np.round(np.arange(float(start), float(end) + 1e-9, float(step)), 6).tolist()
 
 
 def build_int_grid(start: int, end: int, step: int) -> list[int]:
@@ -1586,94 +1841,127 @@ def build_int_grid(start: int, end: int, step: int) -> list[int]:
     return list(range(int(start), int(end) + 1, int(step)))
 
 
-def run_grid_search(
+def _eval_combo(
+    combo: Sequence[float],
+    prepared: PreparedPanel,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+    window_returns: dict[int, np.ndarray] | None = None,
+) -> dict:
+    # Module-level (not a closure) so joblib workers can unpickle it.
+    buy_th, buy_win, sell_th, sell_win, deploy_unit = combo
+    # Combos are float64 rows; NaN deployment means "keep the current sizing".
+    deploy_unit = None if math.isnan(deploy_unit) else float(deploy_unit)
+    local_buy_units = buy_unit_by_ticker
+    if deploy_unit is not None:
+        local_buy_units = {t: deploy_unit for t in buy_unit_by_ticker.keys()}
+
+    summary = _simulate_prepared(
+        prepared,
+        buy_unit_by_ticker=local_buy_units,
+        starting_cash=float(starting_cash),
+        annual_cash_yield_pct=float(annual_cash_yield_pct),
+        annual_borrow_rate_pct=float(annual_borrow_rate_pct),
+        allow_leverage=allow_leverage,
+        buy_threshold_pct=float(buy_th),
+        buy_window_days=int(buy_win),
+        sell_threshold_pct=float(sell_th),
+        sell_window_days=int(sell_win),
+        sell_mode=sell_mode,
+        fee_bps=float(fee_bps),
+        allow_reentry=allow_reentry,
+        return_mode="summary",
+        window_returns=window_returns,
+    )
+
+    if summary["final_total_wealth"] is None:
+        final_cash = float(starting_cash)
+        final_invested = 0.0
+        final_total = final_cash
+    else:
+        final_cash = summary["final_cash"]
+        final_invested = summary["final_invested"]
+        final_total = summary["final_total_wealth"]
+    pnl = final_total - float(starting_cash)
+    total_return_pct = (pnl / float(starting_cash)) * 100.0 if float(starting_cash) > 0 else None
+    trade_count = summary["trade_count"]
+    max_drawdown_pct = summary["max_drawdown_pct"]
+
+    return {
+        "buy_threshold_pct": float(buy_th),
+        "buy_window_days": int(buy_win),
+        "sell_threshold_pct": float(sell_th),
+        "sell_window_days": int(sell_win),
+        "deployment_per_trade_usd": deploy_unit,
+        "starting_cash": float(starting_cash),
+        "final_cash": final_cash,
+        "final_invested": final_invested,
+        "final_total_wealth": final_total,
+        "pnl": pnl,
+        "total_return_pct": total_return_pct,
+        "max_drawdown_pct": max_drawdown_pct,
+        "trade_count": trade_count,
+    }
+
+
+def _evaluate_combos(
+    combos: np.ndarray,
     price_panel: pd.DataFrame,
     buy_unit_by_ticker: dict[str, float],
     starting_cash: float,
     annual_cash_yield_pct: float,
     annual_borrow_rate_pct: float,
     allow_leverage: bool,
-    buy_threshold_values: Sequence[float],
-    buy_window_values: Sequence[int],
-    sell_threshold_values: Sequence[float],
-    sell_window_values: Sequence[int],
     sell_mode: str,
     fee_bps: float,
     allow_reentry: bool,
-    deployment_values: Sequence[float] | None = None,
     progress_callback: Callable[[int, int], None] | None = None,
+    n_jobs: int = GRID_SEARCH_N_JOBS,
 ) -> pd.DataFrame:
     rows: list[dict] = []
-    deploy_vals = [None] if not deployment_values else [float(v) for v in deployment_values]
-    combos = list(
-        product(
-            buy_threshold_values,
-            buy_window_values,
-            sell_threshold_values,
-            sell_window_values,
-            deploy_vals,
-        )
-    )
     total = len(combos)
+    # The price matrix is identical for every combo; build it once and share it. Summary
+    # runs never read the dates, so workers are not sent the Timestamp list.
+    price_mat, valid_mask, _, gap_days = _prepare_panel(price_panel, list(buy_unit_by_ticker))
+    # Window returns depend only on the window length, and combos reuse a handful of
+    # windows across every threshold pair, so compute each distinct window once.
+    window_returns = {
+        int(window): _window_returns(price_mat, valid_mask, int(window)) for window in np.unique(combos[:, [1, 3]])
+    }
+    eval_kwargs = {
+        "prepared": (price_mat, valid_mask, [], gap_days),
+        "buy_unit_by_ticker": buy_unit_by_ticker,
+        "starting_cash": starting_cash,
+        "annual_cash_yield_pct": annual_cash_yield_pct,
+        "annual_borrow_rate_pct": annual_borrow_rate_pct,
+        "allow_leverage": allow_leverage,
+        "sell_mode": sell_mode,
+        "fee_bps": fee_bps,
+        "allow_reentry": allow_reentry,
+        "window_returns": window_returns,
+    }
 
-    for idx, (buy_th, buy_win, sell_th, sell_win, deploy_unit) in enumerate(combos, start=1):
-        local_buy_units = buy_unit_by_ticker
-        if deploy_unit is not None:
-            local_buy_units = {t: float(deploy_unit) for t in buy_unit_by_ticker.keys()}
-
-        trades_df, _, equity_df = run_threshold_simulation(
-            price_panel=price_panel,
-            buy_unit_by_ticker=local_buy_units,
-            starting_cash=float(starting_cash),
-            annual_cash_yield_pct=float(annual_cash_yield_pct),
-            annual_borrow_rate_pct=float(annual_borrow_rate_pct),
-            allow_leverage=allow_leverage,
-            buy_threshold_pct=float(buy_th),
-            buy_window_days=int(buy_win),
-            sell_threshold_pct=float(sell_th),
-            sell_window_days=int(sell_win),
-            sell_mode=sell_mode,
-            fee_bps=float(fee_bps),
-            allow_reentry=allow_reentry,
+    # Combos are independent, so fan them out over worker processes. Small grids stay
+    # in-process because spinning up the loky pool costs more than it saves. loky
+    # memmaps the large panel arrays, so workers share them instead of copying per batch.
+    workers = effective_n_jobs(n_jobs)
+    if workers == 1 or total < GRID_PARALLEL_MIN_COMBOS:
+        results = (_eval_combo(combo, **eval_kwargs) for combo in combos)
+    else:
+        batch_size = max(1, total // (4 * workers))
+        results = Parallel(n_jobs=n_jobs, backend="loky", batch_size=batch_size, return_as="generator")(
+            delayed(_eval_combo)(combo, **eval_kwargs) for combo in combos
         )
 
-        if equity_df.empty:
-            final_cash = float(starting_cash)
-            final_invested = 0.0
-            final_total = final_cash
-        else:
-            last = equity_df.iloc[-1]
-            final_cash = float(last["cash_balance"])
-            final_invested = float(last["portfolio_value"])
-            final_total = float(last["total_wealth"])
-        pnl = final_total - float(starting_cash)
-        total_return_pct = (pnl / float(starting_cash)) * 100.0 if float(starting_cash) > 0 else None
-        trade_count = 0 if trades_df.empty else int(len(trades_df))
-
-        max_drawdown_pct = None
-        if not equity_df.empty and equity_df["total_wealth"].notna().any():
-            eq = equity_df["total_wealth"].astype(float)
-            running_max = eq.cummax()
-            dd = (eq / running_max) - 1.0
-            max_drawdown_pct = float(dd.min() * 100.0)
-
-        rows.append(
-            {
-                "buy_threshold_pct": float(buy_th),
-                "buy_window_days": int(buy_win),
-                "sell_threshold_pct": float(sell_th),
-                "sell_window_days": int(sell_win),
-                "deployment_per_trade_usd": deploy_unit,
-                "starting_cash": float(starting_cash),
-                "final_cash": final_cash,
-                "final_invested": final_invested,
-                "final_total_wealth": final_total,
-                "pnl": pnl,
-                "total_return_pct": total_return_pct,
-                "max_drawdown_pct": max_drawdown_pct,
-                "trade_count": trade_count,
-            }
-        )
+    # Results arrive in submission order, so progress still ticks monotonically.
+    for idx, row in enumerate(results, start=1):
+        rows.append(row)
         if progress_callback:
             progress_callback(idx, total)
 
@@ -1687,6 +1975,179 @@ def run_grid_search(
     return out
 
 
+def _combo_axes(
+    buy_threshold_values: Sequence[float],
+    buy_window_values: Sequence[int],
+    sell_threshold_values: Sequence[float],
+    sell_window_values: Sequence[int],
+    deployment_values: Sequence[float] | None,
+) -> list[np.ndarray]:
+    # "No deployment sweep" is a single NaN entry so every axis stays float64.
+    deploy_vals = [np.nan] if not deployment_values else deployment_values
+    return [
+        np.asarray(values, dtype=np.float64)
+        for values in (buy_threshold_values, buy_window_values, sell_threshold_values, sell_window_values, deploy_vals)
+    ]
+
+
+def run_grid_search(
+    price_panel: pd.DataFrame,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    buy_threshold_values: Sequence[float],
+    buy_window_values: Sequence[int],
+    sell_threshold_values: Sequence[float],
+    sell_window_values: Sequence[int],
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+    deployment_values: Sequence[float] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    n_jobs: int = GRID_SEARCH_N_JOBS,
+) -> pd.DataFrame:
+    axes = _combo_axes(
+        buy_threshold_values, buy_window_values, sell_threshold_values, sell_window_values, deployment_values
+    )
+    # One contiguous (n_combos, 5) float64 block in the same order product() would yield.
+    combos = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, len(axes))
+    return _evaluate_combos(
+        combos,
+        price_panel=price_panel,
+        buy_unit_by_ticker=buy_unit_by_ticker,
+        starting_cash=starting_cash,
+        annual_cash_yield_pct=annual_cash_yield_pct,
+        annual_borrow_rate_pct=annual_borrow_rate_pct,
+        allow_leverage=allow_leverage,
+        sell_mode=sell_mode,
+        fee_bps=fee_bps,
+        allow_reentry=allow_reentry,
+        progress_callback=progress_callback,
+        n_jobs=n_jobs,
+    )
+
+
+def run_random_search(
+    price_panel: pd.DataFrame,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    buy_threshold_values: Sequence[float],
+    buy_window_values: Sequence[int],
+    sell_threshold_values: Sequence[float],
+    sell_window_values: Sequence[int],
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+    n_iter: int,
+    deployment_values: Sequence[float] | None = None,
+    progress_callback: Callable[[int, int], None] | None = None,
+    n_jobs: int = GRID_SEARCH_N_JOBS,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Evaluates a fixed budget of combinations drawn without replacement from the same
+    grid run_grid_search would sweep. Only the sampled combos are materialized.
+    """
+    axes = _combo_axes(
+        buy_threshold_values, buy_window_values, sell_threshold_values, sell_window_values, deployment_values
+    )
+    shape = tuple(axis.size for axis in axes)
+    total = math.prod(shape)
+    combos = np.empty((0, len(axes)), dtype=np.float64)
+    if total > 0 and n_iter > 0:
+        rng = np.random.default_rng(seed)
+        picks = np.sort(rng.choice(total, size=min(int(n_iter), total), replace=False))
+        coords = np.unravel_index(picks, shape)
+        combos = np.column_stack([axis[k] for axis, k in zip(axes, coords)])
+    return _evaluate_combos(
+        combos,
+        price_panel=price_panel,
+        buy_unit_by_ticker=buy_unit_by_ticker,
+        starting_cash=starting_cash,
+        annual_cash_yield_pct=annual_cash_yield_pct,
+        annual_borrow_rate_pct=annual_borrow_rate_pct,
+        allow_leverage=allow_leverage,
+        sell_mode=sell_mode,
+        fee_bps=fee_bps,
+        allow_reentry=allow_reentry,
+        progress_callback=progress_callback,
+        n_jobs=n_jobs,
+    )
+
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def run_parameter_search_cached(
+    price_panel: pd.DataFrame,
+    buy_unit_by_ticker: dict[str, float],
+    starting_cash: float,
+    annual_cash_yield_pct: float,
+    annual_borrow_rate_pct: float,
+    allow_leverage: bool,
+    buy_threshold_values: Sequence[float],
+    buy_window_values: Sequence[int],
+    sell_threshold_values: Sequence[float],
+    sell_window_values: Sequence[int],
+    sell_mode: str,
+    fee_bps: float,
+    allow_reentry: bool,
+    deployment_values: Sequence[float] | None = None,
+    n_iter: int | None = None,
+) -> pd.DataFrame:
+    """
+    Runs the full grid (n_iter=None) or a random sample of it, reusing the ranked table
+    when the same search is requested again.
+
+    The progress widgets are created in here rather than passed in: Streamlit replays a
+    cached function's elements on a hit, and it can only do that for blocks the function
+    itself created. A hit therefore just redraws the finished progress bar.
+    """
+    progress_text = st.empty()
+    progress_bar = st.progress(0)
+    last_update = 0
+
+    def on_progress(done: int, total: int) -> None:
+        # Every update is a websocket message (and is recorded for cache replay), so
+        # redraw roughly once per percent instead of once per combo.
+        nonlocal last_update
+        if done != total and done - last_update < max(1, total // 100):
+            return
+        last_update = done
+        pct = int((done / total) * 100) if total > 0 else 0
+        progress_text.caption(f"Grid progress: {done} / {total}")
+        progress_bar.progress(pct)
+
+    search_kwargs = dict(
+        price_panel=price_panel,
+        buy_unit_by_ticker=buy_unit_by_ticker,
+        starting_cash=starting_cash,
+        annual_cash_yield_pct=annual_cash_yield_pct,
+        annual_borrow_rate_pct=annual_borrow_rate_pct,
+        allow_leverage=allow_leverage,
+        buy_threshold_values=buy_threshold_values,
+        buy_window_values=buy_window_values,
+        sell_threshold_values=sell_threshold_values,
+        sell_window_values=sell_window_values,
+        sell_mode=sell_mode,
+        fee_bps=fee_bps,
+        allow_reentry=allow_reentry,
+        deployment_values=deployment_values,
+        progress_callback=on_progress,
+    )
+    if n_iter is not None:
+        grid_df = run_random_search(**search_kwargs, n_iter=n_iter)
+    else:
+        grid_df = run_grid_search(**search_kwargs)
+    evaluated = len(grid_df)
+    progress_text.caption(f"Grid progress: {evaluated} / {evaluated}")
+    progress_bar.progress(100)
+    return grid_df
+
+
 # -----------------------------
 # UI
 # -----------------------------
@@ -1799,17 +2260,17 @@ if page == "Explorer":
             st.stop()
 
         try:
-            conn = get_conn()
-            subsector_id, basket_df, weights_df, warn = create_or_update_subsector_basket(
-                conn,
-                sector_name=new_sector.strip(),
-                subsector_name=new_subsector.strip(),
-                tickers=tickers_list,
-                weight_method=weight_method,
-                start=start,
-                end=end,
-                is_primary=make_primary,
-            )
+            with get_pool().connection() as conn:
+                subsector_id, basket_df, weights_df, warn = create_or_update_subsector_basket(
+                    conn,
+                    sector_name=new_sector.strip(),
+                    subsector_name=new_subsector.strip(),
+                    tickers=tickers_list,
+                    weight_method=weight_method,
+                    start=start,
+                    end=end,
+                    is_primary=make_primary,
+                )
         except Exception as e:
             st.exception(e)
             st.stop()
@@ -1971,8 +2432,9 @@ else:
             },
             key="sim_alloc_editor",
         )
-        for _, row in edited_alloc.iterrows():
-            alloc_map[str(row["ticker"])] = float(max(0.0, row["buy_unit_usd"]))
+        # fmax treats a cleared (NaN) cell as 0, matching the old max(0.0, value).
+        edited_units = np.fmax(edited_alloc["buy_unit_usd"].to_numpy(dtype=np.float64), 0.0)
+        alloc_map.update(zip(edited_alloc["ticker"].astype(str), edited_units.tolist()))
 
         buy_unit_by_ticker = {t: float(alloc_map.get(t, default_initial)) for t in sim_tickers}
 
@@ -1983,12 +2445,12 @@ else:
         st.warning("Starting cash must be greater than zero.")
         st.stop()
 
-    price_panel = fetch_close_panel(sim_tickers, sim_start, sim_end)
+    price_panel = fetch_close_panel_cached(tuple(sorted(sim_tickers)), sim_start, sim_end)
     if price_panel.empty:
         st.warning("No daily price data found for this selection/date range.")
         st.stop()
 
-    trades_df, final_df, equity_df = run_threshold_simulation(
+    trades_df, final_df, equity_df = run_threshold_simulation_cached(
         price_panel=price_panel,
         buy_unit_by_ticker=buy_unit_by_ticker,
         starting_cash=float(starting_cash),
@@ -2120,22 +2582,30 @@ else:
 
     dep_count = 1 if not grid_deployment_values else len(grid_deployment_values)
     combo_count = len(buy_th_values) * len(buy_win_values) * len(sell_th_values) * len(sell_win_values) * dep_count
-    st.caption(f"Combinations to evaluate: {combo_count}")
-    if combo_count > 400:
-        st.warning("Large grid. Consider tightening ranges for faster results.")
+
+    search_mode = st.radio(
+        "Search mode",
+        ["Full grid", "Random sample"],
+        horizontal=True,
+        key="sim_grid_search_mode",
+        help="Random sample evaluates a fixed number of combinations drawn from the grid above.",
+    )
+    eval_count = combo_count
+    if search_mode == "Random sample":
+        sample_size = st.number_input(
+            "Combinations to sample", min_value=1, max_value=5000, value=50, step=10, key="sim_grid_sample_size"
+        )
+        eval_count = min(int(sample_size), combo_count)
+        st.caption(f"Combinations to evaluate: {eval_count} (of {combo_count} in the full grid)")
+    else:
+        st.caption(f"Combinations to evaluate: {combo_count}")
+    if eval_count > 400:
+        st.warning("Large grid. Consider tightening ranges or using random sampling for faster results.")
 
     run_grid = st.button("Run Grid Search", type="primary")
     if run_grid:
-        progress_text = st.empty()
-        progress_bar = st.progress(0)
-
-        def on_progress(done: int, total: int) -> None:
-            pct = int((done / total) * 100) if total > 0 else 0
-            progress_text.caption(f"Grid progress: {done} / {total}")
-            progress_bar.progress(pct)
-
         with st.spinner("Evaluating parameter combinations..."):
-            grid_df = run_grid_search(
+            grid_df = run_parameter_search_cached(
                 price_panel=price_panel,
                 buy_unit_by_ticker=buy_unit_by_ticker,
                 starting_cash=float(starting_cash),
@@ -2150,10 +2620,8 @@ else:
                 fee_bps=float(fee_bps),
                 allow_reentry=allow_reentry,
                 deployment_values=grid_deployment_values,
-                progress_callback=on_progress,
+                n_iter=eval_count if search_mode == "Random sample" else None,
             )
-        progress_text.caption(f"Grid progress: {combo_count} / {combo_count}")
-        progress_bar.progress(100)
 
         if grid_df.empty:
             st.warning("Grid search returned no results.")
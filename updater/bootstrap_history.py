@@ -1,14 +1,22 @@
 import os
 import sys
 import logging
+from datetime import date, timedelta
+from itertools import repeat
 
+import numpy as np
 import pandas as pd
 import psycopg
+from psycopg import sql
 import yfinance as yf
 import yaml
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
+# prices_1m is range-partitioned by UTC day, one child table per day named like this.
+PARTITION_1M_PREFIX = "prices_1m_p"
+# Upserts up to this many rows skip the COPY stage and send column arrays in one statement.
+DIRECT_UPSERT_MAX_ROWS = 1000
 LOGGER = logging.getLogger("bootstrap_history")
 
 
@@ -34,7 +42,8 @@ def get_conn(cfg: dict) -> psycopg.Connection:
 
 
 def ensure_tables(conn: psycopg.Connection) -> None:
-    with conn.cursor() as cur:
+    # Pipeline mode sends the whole DDL batch with a single sync round-trip.
+    with conn.pipeline(), conn.cursor() as cur:
         cur.execute("""
         CREATE TABLE IF NOT EXISTS prices_1d (
           ticker text NOT NULL,
@@ -58,107 +67,233 @@ def ensure_tables(conn: psycopg.Connection) -> None:
           close double precision,
           volume bigint,
           PRIMARY KEY (ticker, ts)
-        );
+        ) PARTITION BY RANGE (ts);
         """)
         cur.execute("CREATE INDEX IF NOT EXISTS prices_1m_ts_idx ON prices_1m (ts);")
 
 
+def required_tables_exist(conn: psycopg.Connection) -> bool:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT
+              to_regclass('public.prices_1d') IS NOT NULL AS has_1d,
+              to_regclass('public.prices_1m') IS NOT NULL AS has_1m;
+            """
+        )
+        row = cur.fetchone()
+    return bool(row and row[0] and row[1])
+
+
+def prices_1m_is_partitioned(conn: psycopg.Connection) -> bool:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('public.prices_1m'));"
+        )
+        row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def utc_days(index: pd.Index) -> set[date]:
+    idx = pd.to_datetime(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return set(np.unique(idx.values.astype("datetime64[D]")).tolist())
+
+
+def ensure_1m_partitions(conn: psycopg.Connection, days: set[date]) -> None:
+    """
+    Creates the daily UTC partitions (prices_1m_pYYYYMMDD) that rows for `days` will land in.
+
+    Partitions are UNLOGGED: minute bars are a short rolling window that every run
+    re-downloads, so they skip WAL at the cost of being emptied after a crash.
+    """
+    if not days:
+        return
+    with conn.pipeline(), conn.cursor() as cur:
+        for day in sorted(days):
+            cur.execute(
+                sql.SQL("CREATE UNLOGGED TABLE IF NOT EXISTS {} PARTITION OF prices_1m FOR VALUES FROM ({}) TO ({});").format(
+                    sql.Identifier(f"{PARTITION_1M_PREFIX}{day:%Y%m%d}"),
+                    sql.Literal(f"{day.isoformat()} 00:00:00+00"),
+                    sql.Literal(f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00"),
+                )
+            )
+
+
 def normalize_ohlcv(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
     if df is None or df.empty:
         return df
 
     if isinstance(df.columns, pd.MultiIndex):
-        # Most common yfinance format: (Field, Ticker) with ticker on last level
-        if ticker in df.columns.get_level_values(-1):
-            df = df.xs(ticker, axis=1, level=-1)
-        elif ticker in df.columns.get_level_values(0):
-            df = df.xs(ticker, axis=1, level=0)
+        ticker_level = df.columns.levels[-1]
+        if len(ticker_level) == 1 and ticker_level[0] == ticker:
+            # Single-ticker download: dropping the level is about twice as fast as xs().
+            df = df.droplevel(-1, axis=1)
         else:
-            any_t = df.columns.get_level_values(-1)[0]
-            df = df.xs(any_t, axis=1, level=-1)
+            last_values = df.columns.get_level_values(-1)
+            # Most common yfinance format: (Field, Ticker) with ticker on last level
+            if ticker in last_values:
+                df = df.xs(ticker, axis=1, level=-1)
+            elif ticker in df.columns.get_level_values(0):
+                df = df.xs(ticker, axis=1, level=0)
+            else:
+                any_t = last_values[0]
+                df = df.xs(any_t, axis=1, level=-1)
 
     # Ensure expected columns exist
     for col in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
         if col not in df.columns:
-            df[col] = pd.NA
+            # Typed float NaN (not pd.NA) keeps the column numeric; NaN volume still loads as NULL.
+            df[col] = np.nan
     return df
 
 
-def _to_float(x):
-    return float(x) if pd.notna(x) else None
+def _col_float(values: np.ndarray) -> np.ndarray:
+    # Object array of Python floats with None in the NaN slots, built without per-cell calls.
+    a = np.asarray(values, dtype=np.float64)
+    out = a.astype(object)
+    out[np.isnan(a)] = None
+    return out
+
 
+def _col_int(values: np.ndarray) -> np.ndarray:
+    a = np.asarray(values, dtype=np.float64)
+    mask = np.isnan(a)
+    out = np.empty(a.shape, dtype=object)
+    out[~mask] = a[~mask].astype(np.int64)
+    out[mask] = None
+    return out
 
-def _to_int(x):
-    return int(x) if pd.notna(x) else None
+
+def _ohlcv_columns(df: pd.DataFrame, price_cols: list[str]) -> list[np.ndarray]:
+    out = [_col_float(df[col].to_numpy(dtype=np.float64, na_value=np.nan)) for col in price_cols]
+    out.append(_col_int(df["Volume"].to_numpy(dtype=np.float64, na_value=np.nan)))
+    return out
 
 
 def upsert_1d(conn: psycopg.Connection, ticker: str, df: pd.DataFrame) -> None:
     if df is None or df.empty:
         return
 
-    df = df.copy()
-    df.index = pd.to_datetime(df.index).date
-
-    rows = []
-    for dt, r in df.iterrows():
-        rows.append((
-            ticker, dt,
-            _to_float(r["Open"]),
-            _to_float(r["High"]),
-            _to_float(r["Low"]),
-            _to_float(r["Close"]),
-            _to_float(r["Adj Close"]),
-            _to_int(r["Volume"]),
-        ))
+    idx = pd.to_datetime(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)  # keep the local calendar date
+    days = idx.values.astype("datetime64[D]")
+    # The staged merge may touch each key only once; keep the last row per date.
+    keep = ~idx.normalize().duplicated(keep="last")
+    if not keep.all():
+        df = df[keep]
+
+    columns = _ohlcv_columns(df, ["Open", "High", "Low", "Close", "Adj Close"])
+    # datetime64[D].tolist() yields datetime.date objects in one C-level pass.
+    dates = days[keep].tolist()
 
     with conn.cursor() as cur:
-        cur.executemany("""
-            INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (ticker, dt) DO UPDATE SET
-              open=EXCLUDED.open,
-              high=EXCLUDED.high,
-              low=EXCLUDED.low,
-              close=EXCLUDED.close,
-              adj_close=EXCLUDED.adj_close,
-              volume=EXCLUDED.volume;
-        """, rows)
+        if len(dates) <= DIRECT_UPSERT_MAX_ROWS:
+            # Small batches (the usual few-day overlap) go up as column arrays in one
+            # statement: one round-trip instead of three for the staged path. The text does
+            # not depend on the row count, so it stays a single prepared statement. Arrays
+            # bind as %b: list parameters otherwise go as text literals parsed per element.
+            cur.execute("""
+                INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
+                SELECT %s, u.* FROM unnest(
+                  %b::date[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::int8[]
+                ) AS u
+                ON CONFLICT (ticker, dt) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  adj_close=EXCLUDED.adj_close,
+                  volume=EXCLUDED.volume;
+            """, (ticker, dates, *(col.tolist() for col in columns)), prepare=True)
+            return
+
+        # Rows are zipped lazily and streamed into COPY; no list of row tuples is built.
+        rows = zip(repeat(ticker, len(dates)), dates, *columns)
+        # Stream the batch into a session temp table with binary COPY, then merge it
+        # with a single INSERT ... SELECT instead of one round-trip per row.
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS stage_1d (LIKE prices_1d INCLUDING DEFAULTS);")
+        with cur.copy(
+            "COPY stage_1d (ticker, dt, open, high, low, close, adj_close, volume) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            copy.set_types(["text", "date", "float8", "float8", "float8", "float8", "float8", "int8"])
+            for row in rows:
+                copy.write_row(row)
+        # COPY cannot run inside a pipeline, but the merge and cleanup can share one sync.
+        # The merge is prepared once per connection, so later tickers skip the Parse step.
+        with conn.pipeline():
+            cur.execute("""
+                INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
+                SELECT ticker, dt, open, high, low, close, adj_close, volume FROM stage_1d
+                ON CONFLICT (ticker, dt) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  adj_close=EXCLUDED.adj_close,
+                  volume=EXCLUDED.volume;
+            """, prepare=True)
+            cur.execute("TRUNCATE stage_1d;")
 
 
 def upsert_1m(conn: psycopg.Connection, ticker: str, df: pd.DataFrame) -> None:
     if df is None or df.empty:
         return
 
-    df = df.copy()
     idx = pd.to_datetime(df.index)
-    if idx.tz is None:
-        idx = idx.tz_localize("UTC")
-    else:
-        idx = idx.tz_convert("UTC")
-    df.index = idx
-
-    rows = []
-    for ts, r in df.iterrows():
-        rows.append((
-            ticker, ts.to_pydatetime(),
-            _to_float(r["Open"]),
-            _to_float(r["High"]),
-            _to_float(r["Low"]),
-            _to_float(r["Close"]),
-            _to_int(r["Volume"]),
-        ))
+    # Normalize to naive UTC (tz-naive input is already UTC) so the values convert to
+    # Python datetimes in one datetime64[us].tolist() pass.
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    ts_utc = idx.values.astype("datetime64[us]")
+    keep = ~idx.duplicated(keep="last")
+    if not keep.all():
+        df = df[keep]
+
+    columns = _ohlcv_columns(df, ["Open", "High", "Low", "Close"])
+    timestamps = ts_utc[keep].tolist()
 
     with conn.cursor() as cur:
-        cur.executemany("""
-            INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
-            VALUES (%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (ticker, ts) DO UPDATE SET
-              open=EXCLUDED.open,
-              high=EXCLUDED.high,
-              low=EXCLUDED.low,
-              close=EXCLUDED.close,
-              volume=EXCLUDED.volume;
-        """, rows)
+        if len(timestamps) <= DIRECT_UPSERT_MAX_ROWS:
+            # Naive UTC datetimes, so the array is cast from timestamp explicitly.
+            cur.execute("""
+                INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
+                SELECT %s, u.ts AT TIME ZONE 'UTC', u.open, u.high, u.low, u.close, u.volume FROM unnest(
+                  %b::timestamp[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::int8[]
+                ) AS u (ts, open, high, low, close, volume)
+                ON CONFLICT (ticker, ts) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  volume=EXCLUDED.volume;
+            """, (ticker, timestamps, *(col.tolist() for col in columns)), prepare=True)
+            return
+
+        rows = zip(repeat(ticker, len(timestamps)), timestamps, *columns)
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS stage_1m (LIKE prices_1m INCLUDING DEFAULTS);")
+        with cur.copy(
+            "COPY stage_1m (ticker, ts, open, high, low, close, volume) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            # timestamp and timestamptz share a binary format (microseconds since 2000-01-01),
+            # so naive UTC datetimes load into the timestamptz column unshifted.
+            copy.set_types(["text", "timestamp", "float8", "float8", "float8", "float8", "int8"])
+            for row in rows:
+                copy.write_row(row)
+        with conn.pipeline():
+            cur.execute("""
+                INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
+                SELECT ticker, ts, open, high, low, close, volume FROM stage_1m
+                ON CONFLICT (ticker, ts) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  volume=EXCLUDED.volume;
+            """, prepare=True)
+            cur.execute("TRUNCATE stage_1m;")
 
 
 def configure_logging() -> None:
@@ -205,11 +340,15 @@ def main():
     df = normalize_ohlcv(df, ticker)
 
     with get_conn(cfg) as conn:
-        ensure_tables(conn)
+        # One catalog lookup instead of re-running the DDL on every bootstrap.
+        if not required_tables_exist(conn):
+            ensure_tables(conn)
         if interval == "1d":
             upsert_1d(conn, ticker, df)
             table_name = "prices_1d"
         else:
+            if df is not None and not df.empty and prices_1m_is_partitioned(conn):
+                ensure_1m_partitions(conn, utc_days(df.index))
             upsert_1m(conn, ticker, df)
             table_name = "prices_1m"
         conn.commit()
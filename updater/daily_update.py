@@ -1,17 +1,29 @@
 import os
 import logging
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import date, datetime, timedelta, timezone
-from time import monotonic, sleep
+from itertools import repeat
+from time import monotonic, sleep, time
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from curl_cffi import requests as curl_requests
+import numpy as np
 import pandas as pd
 import psycopg
+from psycopg import sql
 import yfinance as yf
 import yaml
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "config.yaml")
+# prices_1m is range-partitioned by UTC day, one child table per day named like this.
+PARTITION_1M_PREFIX = "prices_1m_p"
+# Upserts up to this many rows skip the COPY stage and send column arrays in one statement.
+DIRECT_UPSERT_MAX_ROWS = 1000
+# Market-local hour after which a session's daily bar is treated as final (an hour after the 16:00 close).
+MARKET_DAILY_SETTLED_HOUR = 17
 LOGGER = logging.getLogger("daily_update")
 
 
@@ -48,7 +60,8 @@ def get_conn(cfg: dict) -> psycopg.Connection:
 
 
 def ensure_tables(conn: psycopg.Connection, ddl_lock_timeout_s: int = 10) -> None:
-    with conn.cursor() as cur:
+    # Pipeline mode sends the whole DDL batch with a single sync round-trip.
+    with conn.pipeline(), conn.cursor() as cur:
         safe_timeout = max(1, int(ddl_lock_timeout_s))
         cur.execute(f"SET LOCAL lock_timeout = '{safe_timeout}s';")
         cur.execute(f"SET LOCAL statement_timeout = '{max(5, safe_timeout * 2)}s';")
@@ -75,22 +88,66 @@ def ensure_tables(conn: psycopg.Connection, ddl_lock_timeout_s: int = 10) -> Non
           close double precision,
           volume bigint,
           PRIMARY KEY (ticker, ts)
-        );
+        ) PARTITION BY RANGE (ts);
         """)
         cur.execute("CREATE INDEX IF NOT EXISTS prices_1m_ts_idx ON prices_1m (ts);")
 
 
-def required_tables_exist(conn: psycopg.Connection) -> bool:
+def get_schema_state(conn: psycopg.Connection) -> tuple[bool, bool]:
+    """
+    Returns (required tables exist, prices_1m is partitioned) from a single catalog query.
+    """
     with conn.cursor() as cur:
         cur.execute(
             """
             SELECT
               to_regclass('public.prices_1d') IS NOT NULL AS has_1d,
-              to_regclass('public.prices_1m') IS NOT NULL AS has_1m;
+              to_regclass('public.prices_1m') IS NOT NULL AS has_1m,
+              EXISTS (
+                SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('public.prices_1m')
+              ) AS partitioned_1m;
             """
         )
         row = cur.fetchone()
-    return bool(row and row[0] and row[1])
+    if not row:
+        return False, False
+    return bool(row[0] and row[1]), bool(row[2])
+
+
+def prices_1m_is_partitioned(conn: psycopg.Connection) -> bool:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('public.prices_1m'));"
+        )
+        row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def utc_days(index: pd.Index) -> set[date]:
+    idx = pd.to_datetime(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return set(np.unique(idx.values.astype("datetime64[D]")).tolist())
+
+
+def ensure_1m_partitions(conn: psycopg.Connection, days: set[date]) -> None:
+    """
+    Creates the daily UTC partitions (prices_1m_pYYYYMMDD) that rows for `days` will land in.
+
+    Partitions are UNLOGGED: minute bars are a short rolling window that every run
+    re-downloads, so they skip WAL at the cost of being emptied after a crash.
+    """
+    if not days:
+        return
+    with conn.pipeline(), conn.cursor() as cur:
+        for day in sorted(days):
+            cur.execute(
+                sql.SQL("CREATE UNLOGGED TABLE IF NOT EXISTS {} PARTITION OF prices_1m FOR VALUES FROM ({}) TO ({});").format(
+                    sql.Identifier(f"{PARTITION_1M_PREFIX}{day:%Y%m%d}"),
+                    sql.Literal(f"{day.isoformat()} 00:00:00+00"),
+                    sql.Literal(f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00"),
+                )
+            )
 
 
 def normalize_ohlcv(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
@@ -102,116 +159,196 @@ def normalize_ohlcv(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
         return df
 
     if isinstance(df.columns, pd.MultiIndex):
-        # Most common: (Field, Ticker) with ticker on last level
-        if ticker in df.columns.get_level_values(-1):
-            df = df.xs(ticker, axis=1, level=-1)
-        elif ticker in df.columns.get_level_values(0):
-            df = df.xs(ticker, axis=1, level=0)
+        ticker_level = df.columns.levels[-1]
+        if len(ticker_level) == 1 and ticker_level[0] == ticker:
+            # Single-ticker download: just drop the ticker level, which is about twice as
+            # fast as the generic xs() slice. `levels` is cached on the index, so the check is cheap.
+            df = df.droplevel(-1, axis=1)
         else:
-            # fallback: use first ticker slice
-            any_t = df.columns.get_level_values(-1)[0]
-            df = df.xs(any_t, axis=1, level=-1)
+            last_values = df.columns.get_level_values(-1)
+            # Most common: (Field, Ticker) with ticker on last level
+            if ticker in last_values:
+                df = df.xs(ticker, axis=1, level=-1)
+            elif ticker in df.columns.get_level_values(0):
+                df = df.xs(ticker, axis=1, level=0)
+            else:
+                # fallback: use first ticker slice
+                any_t = last_values[0]
+                df = df.xs(any_t, axis=1, level=-1)
 
     # Ensure expected columns exist (Adj Close may be absent)
     for col in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
         if col not in df.columns:
-            df[col] = pd.NA
+            # Typed float NaN (not pd.NA) keeps the column numeric; NaN volume still loads as NULL.
+            df[col] = np.nan
     return df
 
 
-def _to_float(x):
-    return float(x) if pd.notna(x) else None
+def _col_float(values: np.ndarray) -> np.ndarray:
+    # Object array of Python floats with None in the NaN slots, built without per-cell calls.
+    a = np.asarray(values, dtype=np.float64)
+    out = a.astype(object)
+    out[np.isnan(a)] = None
+    return out
 
 
-def _to_int(x):
-    return int(x) if pd.notna(x) else None
+def _col_int(values: np.ndarray) -> np.ndarray:
+    a = np.asarray(values, dtype=np.float64)
+    mask = np.isnan(a)
+    out = np.empty(a.shape, dtype=object)
+    out[~mask] = a[~mask].astype(np.int64)
+    out[mask] = None
+    return out
+
+
+def _ohlcv_columns(df: pd.DataFrame, price_cols: list[str]) -> list[np.ndarray]:
+    out = [_col_float(df[col].to_numpy(dtype=np.float64, na_value=np.nan)) for col in price_cols]
+    out.append(_col_int(df["Volume"].to_numpy(dtype=np.float64, na_value=np.nan)))
+    return out
 
 
 def upsert_1d(conn: psycopg.Connection, ticker: str, df: pd.DataFrame) -> None:
     if df is None or df.empty:
         return
 
-    df = df.copy()
-    df.index = pd.to_datetime(df.index).date  # date index
-
-    rows = []
-    for dt, r in df.iterrows():
-        rows.append((
-            ticker, dt,
-            _to_float(r["Open"]),
-            _to_float(r["High"]),
-            _to_float(r["Low"]),
-            _to_float(r["Close"]),
-            _to_float(r["Adj Close"]),
-            _to_int(r["Volume"]),
-        ))
+    idx = pd.to_datetime(df.index)
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)  # keep the local calendar date
+    days = idx.values.astype("datetime64[D]")
+    # The staged merge may touch each key only once; keep the last row per date.
+    keep = ~idx.normalize().duplicated(keep="last")
+    if not keep.all():
+        df = df[keep]
+
+    columns = _ohlcv_columns(df, ["Open", "High", "Low", "Close", "Adj Close"])
+    # datetime64[D].tolist() yields datetime.date objects in one C-level pass.
+    dates = days[keep].tolist()
 
     with conn.cursor() as cur:
-        cur.executemany("""
-            INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (ticker, dt) DO UPDATE SET
-              open=EXCLUDED.open,
-              high=EXCLUDED.high,
-              low=EXCLUDED.low,
-              close=EXCLUDED.close,
-              adj_close=EXCLUDED.adj_close,
-              volume=EXCLUDED.volume;
-        """, rows)
+        if len(dates) <= DIRECT_UPSERT_MAX_ROWS:
+            # Small batches (the usual few-day overlap) go up as column arrays in one
+            # statement: one round-trip instead of three for the staged path. The text does
+            # not depend on the row count, so it stays a single prepared statement. Arrays
+            # bind as %b: list parameters otherwise go as text literals parsed per element.
+            cur.execute("""
+                INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
+                SELECT %s, u.* FROM unnest(
+                  %b::date[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::int8[]
+                ) AS u
+                ON CONFLICT (ticker, dt) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  adj_close=EXCLUDED.adj_close,
+                  volume=EXCLUDED.volume;
+            """, (ticker, dates, *(col.tolist() for col in columns)), prepare=True)
+            return
+
+        # Rows are zipped lazily and streamed into COPY; no list of row tuples is built.
+        rows = zip(repeat(ticker, len(dates)), dates, *columns)
+        # Stream the batch into a session temp table with binary COPY, then merge it
+        # with a single INSERT ... SELECT instead of one round-trip per row.
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS stage_1d (LIKE prices_1d INCLUDING DEFAULTS);")
+        with cur.copy(
+            "COPY stage_1d (ticker, dt, open, high, low, close, adj_close, volume) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            copy.set_types(["text", "date", "float8", "float8", "float8", "float8", "float8", "int8"])
+            for row in rows:
+                copy.write_row(row)
+        # COPY cannot run inside a pipeline, but the merge and cleanup can share one sync.
+        # The merge is prepared once per connection, so later tickers skip the Parse step.
+        with conn.pipeline():
+            cur.execute("""
+                INSERT INTO prices_1d (ticker, dt, open, high, low, close, adj_close, volume)
+                SELECT ticker, dt, open, high, low, close, adj_close, volume FROM stage_1d
+                ON CONFLICT (ticker, dt) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  adj_close=EXCLUDED.adj_close,
+                  volume=EXCLUDED.volume;
+            """, prepare=True)
+            cur.execute("TRUNCATE stage_1d;")
 
 
 def upsert_1m(conn: psycopg.Connection, ticker: str, df: pd.DataFrame) -> None:
     if df is None or df.empty:
         return
 
-    df = df.copy()
     idx = pd.to_datetime(df.index)
 
-    # Normalize to UTC timestamptz
-    if idx.tz is None:
-        idx = idx.tz_localize("UTC")
-    else:
-        idx = idx.tz_convert("UTC")
-    df.index = idx
-
-    rows = []
-    for ts, r in df.iterrows():
-        rows.append((
-            ticker, ts.to_pydatetime(),
-            _to_float(r["Open"]),
-            _to_float(r["High"]),
-            _to_float(r["Low"]),
-            _to_float(r["Close"]),
-            _to_int(r["Volume"]),
-        ))
+    # Normalize to naive UTC (tz-naive input is already UTC) so the values convert to
+    # Python datetimes in one datetime64[us].tolist() pass.
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    ts_utc = idx.values.astype("datetime64[us]")
+    keep = ~idx.duplicated(keep="last")
+    if not keep.all():
+        df = df[keep]
+
+    columns = _ohlcv_columns(df, ["Open", "High", "Low", "Close"])
+    timestamps = ts_utc[keep].tolist()
 
     with conn.cursor() as cur:
-        cur.executemany("""
-            INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
-            VALUES (%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (ticker, ts) DO UPDATE SET
-              open=EXCLUDED.open,
-              high=EXCLUDED.high,
-              low=EXCLUDED.low,
-              close=EXCLUDED.close,
-              volume=EXCLUDED.volume;
-        """, rows)
+        if len(timestamps) <= DIRECT_UPSERT_MAX_ROWS:
+            # Naive UTC datetimes, so the array is cast from timestamp explicitly.
+            cur.execute("""
+                INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
+                SELECT %s, u.ts AT TIME ZONE 'UTC', u.open, u.high, u.low, u.close, u.volume FROM unnest(
+                  %b::timestamp[], %b::float8[], %b::float8[], %b::float8[], %b::float8[], %b::int8[]
+                ) AS u (ts, open, high, low, close, volume)
+                ON CONFLICT (ticker, ts) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  volume=EXCLUDED.volume;
+            """, (ticker, timestamps, *(col.tolist() for col in columns)), prepare=True)
+            return
+
+        rows = zip(repeat(ticker, len(timestamps)), timestamps, *columns)
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS stage_1m (LIKE prices_1m INCLUDING DEFAULTS);")
+        with cur.copy(
+            "COPY stage_1m (ticker, ts, open, high, low, close, volume) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            # timestamp and timestamptz share a binary format (microseconds since 2000-01-01),
+            # so naive UTC datetimes load into the timestamptz column unshifted.
+            copy.set_types(["text", "timestamp", "float8", "float8", "float8", "float8", "int8"])
+            for row in rows:
+                copy.write_row(row)
+        with conn.pipeline():
+            cur.execute("""
+                INSERT INTO prices_1m (ticker, ts, open, high, low, close, volume)
+                SELECT ticker, ts, open, high, low, close, volume FROM stage_1m
+                ON CONFLICT (ticker, ts) DO UPDATE SET
+                  open=EXCLUDED.open,
+                  high=EXCLUDED.high,
+                  low=EXCLUDED.low,
+                  close=EXCLUDED.close,
+                  volume=EXCLUDED.volume;
+            """, prepare=True)
+            cur.execute("TRUNCATE stage_1m;")
 
 
 def get_latest_1d_dt_map(conn: psycopg.Connection, tickers: list[str]) -> dict[str, date]:
     if not tickers:
         return {}
     with conn.cursor() as cur:
-        # Single indexed pass to get the latest date per ticker.
+        # One backward probe of the (ticker, dt) primary key per ticker instead of
+        # reading and sorting every stored row for the set.
         cur.execute(
             """
-            SELECT t.ticker, t.dt
-            FROM (
-              SELECT DISTINCT ON (ticker) ticker, dt
-              FROM prices_1d
-              WHERE ticker = ANY(%s)
-              ORDER BY ticker, dt DESC
-            ) AS t;
+            SELECT t.ticker, l.dt
+            FROM unnest(%s::text[]) AS t(ticker)
+            CROSS JOIN LATERAL (
+              SELECT p.dt
+              FROM prices_1d AS p
+              WHERE p.ticker = t.ticker
+              ORDER BY p.dt DESC
+              LIMIT 1
+            ) AS l;
             """,
             (tickers,),
         )
@@ -223,22 +360,41 @@ def get_global_latest_1d_dt(conn: psycopg.Connection, tickers: list[str]) -> dat
     if not tickers:
         return None
     with conn.cursor() as cur:
-        cur.execute("SELECT MAX(dt) FROM prices_1d WHERE ticker = ANY(%s);", (tickers,))
+        cur.execute(
+            """
+            SELECT MAX(l.dt)
+            FROM unnest(%s::text[]) AS t(ticker)
+            CROSS JOIN LATERAL (
+              SELECT p.dt
+              FROM prices_1d AS p
+              WHERE p.ticker = t.ticker
+              ORDER BY p.dt DESC
+              LIMIT 1
+            ) AS l;
+            """,
+            (tickers,),
+        )
         row = cur.fetchone()
     return None if not row or row[0] is None else row[0]
 
 
-def configure_db_session_timeouts(
+def configure_db_session(
     conn: psycopg.Connection,
     *,
     lock_timeout_s: int,
     statement_timeout_s: int,
+    synchronous_commit: bool = True,
 ) -> None:
     safe_lock = max(1, int(lock_timeout_s))
     safe_stmt = max(5, int(statement_timeout_s))
-    with conn.cursor() as cur:
+    with conn.pipeline(), conn.cursor() as cur:
         cur.execute("SELECT set_config('lock_timeout', %s, false);", (f"{safe_lock}s",))
         cur.execute("SELECT set_config('statement_timeout', %s, false);", (f"{safe_stmt}s",))
+        # Off: COMMIT returns before the WAL flush. A crash can lose the last few commits
+        # (never corrupt them), which the next scheduled run re-downloads anyway.
+        cur.execute(
+            "SELECT set_config('synchronous_commit', %s, false);", ("on" if synchronous_commit else "off",)
+        )
 
 
 def try_acquire_updater_lock(conn: psycopg.Connection, lock_name: str) -> bool:
@@ -259,6 +415,9 @@ def download_ohlcv(
     interval: str,
     start: str | None = None,
     period: str | None = None,
+    group_by: str = "column",
+    threads: bool = False,
+    session: curl_requests.Session | None = None,
     timeout_s: int = 25,
     retries: int = 2,
     retry_backoff_s: float = 2.0,
@@ -269,15 +428,18 @@ def download_ohlcv(
     kwargs = {
         "tickers": ticker,
         "interval": interval,
+        "group_by": group_by,
         "auto_adjust": False,
         "progress": False,
-        "threads": False,
+        "threads": threads,
         "timeout": max(5, int(timeout_s)),
     }
     if start is not None:
         kwargs["start"] = start
     if period is not None:
         kwargs["period"] = period
+    if session is not None:
+        kwargs["session"] = session
 
     max_attempts = max(1, int(retries) + 1)
     last_exc: Exception | None = None
@@ -311,7 +473,8 @@ def download_ohlcv(
                 repr(exc),
             )
             if attempt < max_attempts:
-                wait_s = max(0.5, float(retry_backoff_s)) * attempt
+                # Exponential backoff: a throttled Yahoo endpoint needs progressively longer pauses.
+                wait_s = max(0.5, float(retry_backoff_s)) * (2 ** (attempt - 1))
                 LOGGER.info(
                     "retrying ticker=%s interval=%s after %.1fs (%s retries left)",
                     ticker,
@@ -326,25 +489,143 @@ def download_ohlcv(
     ) from last_exc
 
 
+def download_ohlcv_batch(
+    tickers: list[str],
+    *,
+    interval: str,
+    start: str | None = None,
+    period: str | None = None,
+    session: curl_requests.Session | None = None,
+    timeout_s: int = 25,
+    retries: int = 2,
+    retry_backoff_s: float = 2.0,
+) -> dict[str, pd.DataFrame]:
+    """
+    Downloads several tickers with a single yf.download call and splits the result
+    back into normalized per-ticker frames. Tickers missing from the response map
+    to an empty frame. Runs on a worker thread, so it must not touch the DB connection.
+    """
+    df = download_ohlcv(
+        " ".join(tickers),
+        interval=interval,
+        start=start,
+        period=period,
+        group_by="ticker",
+        threads=len(tickers) > 1,
+        session=session,
+        timeout_s=timeout_s,
+        retries=retries,
+        retry_backoff_s=retry_backoff_s,
+    )
+    frames: dict[str, pd.DataFrame] = {}
+    for t in tickers:
+        if df is None or df.empty:
+            part = pd.DataFrame()
+        elif isinstance(df.columns, pd.MultiIndex):
+            # group_by="ticker" puts the ticker on level 0; the batch index is the union
+            # of all tickers' bars, so drop rows where this ticker has no data.
+            part = df[t].dropna(how="all") if t in df.columns.get_level_values(0) else pd.DataFrame()
+        else:
+            part = df if len(tickers) == 1 else pd.DataFrame()
+        frames[t] = normalize_ohlcv(part, t)
+    return frames
+
+
+def _cache_path_1d(cache_dir: str, ticker: str) -> str:
+    return os.path.join(cache_dir, f"{ticker}_1d.pkl")
+
+
+def read_cached_1d(cache_dir: str, ticker: str) -> tuple[pd.DataFrame | None, float]:
+    """
+    Returns the cached normalized 1d frame for a ticker and its age in seconds,
+    or (None, inf) when there is no usable cache entry.
+    """
+    path = _cache_path_1d(cache_dir, ticker)
+    try:
+        age_s = time() - os.path.getmtime(path)
+        return pd.read_pickle(path), age_s
+    except FileNotFoundError:
+        return None, float("inf")
+    except Exception as exc:
+        LOGGER.warning("ignoring unreadable 1d cache ticker=%s path=%s err=%s", ticker, path, repr(exc))
+        return None, float("inf")
+
+
+def write_cached_1d(cache_dir: str, ticker: str, df: pd.DataFrame) -> None:
+    path = _cache_path_1d(cache_dir, ticker)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        LOGGER.warning("failed writing 1d cache ticker=%s path=%s err=%s", ticker, path, repr(exc))
+
+
+def merge_cached_1d(
+    cached: pd.DataFrame | None,
+    fresh: pd.DataFrame | None,
+    fetched_from: date,
+) -> pd.DataFrame | None:
+    if cached is None or cached.empty:
+        return fresh
+    head = cached[cached.index < pd.Timestamp(fetched_from)]
+    if fresh is None or fresh.empty:
+        return head
+    merged = pd.concat([head, fresh])
+    return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+
+def list_1m_partitions(conn: psycopg.Connection) -> list[tuple[str, date]]:
+    """
+    Returns (partition name, UTC day) for each daily child of a partitioned prices_1m.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'prices_1m'::regclass;
+            """
+        )
+        names = [r[0] for r in cur.fetchall()]
+    out = []
+    for name in names:
+        day_str = name[len(PARTITION_1M_PREFIX):]
+        if name.startswith(PARTITION_1M_PREFIX) and len(day_str) == 8 and day_str.isdigit():
+            out.append((name, datetime.strptime(day_str, "%Y%m%d").date()))
+    return out
+
+
 def cleanup_1m(conn: psycopg.Connection, keep_hours: int) -> None:
     cutoff = datetime.now(timezone.utc) - timedelta(hours=keep_hours)
-    with conn.cursor() as cur:
+    # Days that end before the cutoff are dropped whole (no per-row WAL); the ranged
+    # DELETE then only touches the partition straddling the cutoff. An unpartitioned
+    # table has no children, so this is a no-op there.
+    expired = [name for name, day in list_1m_partitions(conn) if day + timedelta(days=1) <= cutoff.date()]
+    with conn.pipeline(), conn.cursor() as cur:
+        if expired:
+            cur.execute(sql.SQL("DROP TABLE {};").format(sql.SQL(", ").join(map(sql.Identifier, expired))))
         cur.execute("DELETE FROM prices_1m WHERE ts < %s;", (cutoff,))
 
 
 def truncate_1m(conn: psycopg.Connection, lock_timeout_s: int = 15) -> None:
-    with conn.cursor() as cur:
+    partitions = list_1m_partitions(conn)
+    with conn.pipeline(), conn.cursor() as cur:
         safe_lock_timeout_s = max(1, int(lock_timeout_s))
         cur.execute(f"SET LOCAL lock_timeout = '{safe_lock_timeout_s}s';")
         cur.execute("TRUNCATE TABLE prices_1m;")
+        if partitions:
+            # Emptied daily partitions are recreated on demand; drop them so they do not pile up.
+            cur.execute(sql.SQL("DROP TABLE {};").format(sql.SQL(", ").join(sql.Identifier(n) for n, _ in partitions)))
 
 
 def build_daily_from_intraday(df1m: pd.DataFrame, market_tz: str) -> pd.DataFrame:
     if df1m is None or df1m.empty:
         return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Adj Close", "Volume"])
 
-    df = df1m.copy()
-    idx = pd.to_datetime(df.index)
+    idx = pd.to_datetime(df1m.index)
     if idx.tz is None:
         idx = idx.tz_localize("UTC")
     else:
@@ -357,10 +638,8 @@ def build_daily_from_intraday(df1m: pd.DataFrame, market_tz: str) -> pd.DataFram
         LOGGER.warning("invalid market_timezone=%s; falling back to UTC", market_tz)
         local_idx = idx
 
-    df.index = local_idx
-    df["market_dt"] = df.index.date
-
-    grouped = df.groupby("market_dt", sort=True)
+    # Group by the market-local date directly; no copy of the minute frame is needed.
+    grouped = df1m.groupby(pd.Index(local_idx.date, name="market_dt"), sort=True)
     out = pd.DataFrame({
         "Open": grouped["Open"].first(),
         "High": grouped["High"].max(),
@@ -387,6 +666,26 @@ def select_provisional_rows(df1d: pd.DataFrame, provisional_1d: pd.DataFrame) ->
     return provisional_1d[pd.to_datetime(provisional_1d.index).date > max_official]
 
 
+def last_settled_session(now_utc: datetime, market_tz: str) -> tuple[date, datetime]:
+    """
+    Returns the most recent weekday session whose daily bar has settled, and the UTC time
+    it settled at. Exchange holidays are not modelled: a holiday session has no bar, so
+    anything compared against it just looks stale and is refetched.
+    """
+    try:
+        tz = ZoneInfo(market_tz)
+    except ZoneInfoNotFoundError:
+        tz = timezone.utc
+    local_now = now_utc.astimezone(tz)
+    day = local_now.date()
+    if local_now.hour < MARKET_DAILY_SETTLED_HOUR:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    settled_at = datetime(day.year, day.month, day.day, MARKET_DAILY_SETTLED_HOUR, tzinfo=tz)
+    return day, settled_at.astimezone(timezone.utc)
+
+
 def configure_logging() -> None:
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     logging.basicConfig(
@@ -412,10 +711,17 @@ def main() -> int:
     schema_ddl_lock_timeout_s = max(1, int(ucfg.get("schema_ddl_lock_timeout_s", 10)))
     db_lock_timeout_s = max(1, int(ucfg.get("db_lock_timeout_s", 15)))
     db_statement_timeout_s = max(5, int(ucfg.get("db_statement_timeout_s", 120)))
+    db_synchronous_commit = bool(ucfg.get("db_synchronous_commit", False))
     updater_lock_name = str(ucfg.get("updater_lock_name", "ticker-db:daily_update"))
     yfinance_timeout_s = max(5, int(ucfg.get("yfinance_timeout_s", 25)))
     yfinance_retries = max(0, int(ucfg.get("yfinance_retries", 2)))
     yfinance_retry_backoff_s = max(0.5, float(ucfg.get("yfinance_retry_backoff_s", 2.0)))
+    download_workers = max(1, int(ucfg.get("download_workers", 8)))
+    download_batch_size = max(1, int(ucfg.get("download_batch_size", 20)))
+    cache_dir = str(ucfg.get("yfinance_cache_dir", "cache") or "")
+    if cache_dir and not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(BASE_DIR, cache_dir)
+    cache_ttl_s = max(0, int(ucfg.get("yfinance_cache_ttl_s", 900)))
     promote_intraday_to_1d = bool(ucfg.get("promote_intraday_to_1d", True))
     market_timezone = str(ucfg.get("market_timezone", "America/New_York"))
     daily_start_mode = str(ucfg.get("daily_start_mode", "from_db")).lower()
@@ -436,7 +742,8 @@ def main() -> int:
 
     LOGGER.info(
         "run start tickers=%s daily_start_mode=%s overlap_days=%s intraday_enabled=%s intraday_period=%s "
-        "promote_intraday_to_1d=%s market_timezone=%s yf_timeout_s=%s yf_retries=%s",
+        "promote_intraday_to_1d=%s market_timezone=%s yf_timeout_s=%s yf_retries=%s download_workers=%s "
+        "download_batch_size=%s",
         total_tickers,
         daily_start_mode,
         daily_overlap_days,
@@ -446,6 +753,8 @@ def main() -> int:
         market_timezone,
         yfinance_timeout_s,
         yfinance_retries,
+        download_workers,
+        download_batch_size,
     )
 
     LOGGER.info("opening db session")
@@ -459,23 +768,27 @@ def main() -> int:
                 return 1
             LOGGER.info("updater advisory lock acquired")
 
-            configure_db_session_timeouts(
+            configure_db_session(
                 conn,
                 lock_timeout_s=db_lock_timeout_s,
                 statement_timeout_s=db_statement_timeout_s,
+                synchronous_commit=db_synchronous_commit,
             )
             LOGGER.info(
-                "db session timeouts configured lock_timeout=%ss statement_timeout=%ss",
+                "db session configured lock_timeout=%ss statement_timeout=%ss synchronous_commit=%s",
                 db_lock_timeout_s,
                 db_statement_timeout_s,
+                db_synchronous_commit,
             )
             LOGGER.info("checking required tables")
-            if required_tables_exist(conn):
+            tables_exist, partitioned_1m = get_schema_state(conn)
+            if tables_exist:
                 LOGGER.info("required tables exist; skipping DDL ensure")
             else:
                 LOGGER.info("required tables missing; ensuring tables/indexes (ddl_lock_timeout=%ss)", schema_ddl_lock_timeout_s)
                 ensure_tables(conn, ddl_lock_timeout_s=schema_ddl_lock_timeout_s)
                 conn.commit()
+                partitioned_1m = prices_1m_is_partitioned(conn)
                 LOGGER.info("table/index ensure complete")
             latest_1d_map: dict[str, date] = {}
             latest_1d_global: date | None = None
@@ -502,36 +815,129 @@ def main() -> int:
                     LOGGER.exception("failed truncating prices_1m before intraday load")
                     return 1
 
+            start_days: dict[str, date] = {}
+            for t in tickers:
+                if daily_start_mode == "from_db":
+                    latest_dt = latest_1d_map.get(t)
+                    if latest_dt is None:
+                        start_days[t] = fallback_start_bootstrap
+                    else:
+                        start_days[t] = latest_dt - timedelta(days=daily_overlap_days)
+                elif daily_start_mode == "from_db_global":
+                    if latest_1d_global is None:
+                        start_days[t] = fallback_start_bootstrap
+                    else:
+                        start_days[t] = latest_1d_global - timedelta(days=daily_overlap_days)
+                else:
+                    start_days[t] = fallback_start_fixed
+
+            frames_1d: dict[str, pd.DataFrame] = {}
+            frames_1m: dict[str, pd.DataFrame] = {}
+            download_errors: dict[str, Exception] = {}
+            cached_1d: dict[str, pd.DataFrame] = {}
+            fetch_starts = dict(start_days)
+            if cache_dir:
+                settled_day, settled_at = last_settled_session(datetime.now(timezone.utc), market_timezone)
+                settled_count = 0
+                for t in tickers:
+                    cached, age_s = read_cached_1d(cache_dir, t)
+                    if cached is None or cached.empty or cached.index.min() > pd.Timestamp(start_days[t]):
+                        continue
+                    # Written after the last session settled and already holding its bar: no
+                    # newer daily bar exists until the next session closes, whatever the TTL.
+                    settled = cached.index.max().date() >= settled_day and time() - age_s >= settled_at.timestamp()
+                    if settled:
+                        settled_count += 1
+                    if age_s < cache_ttl_s or settled:
+                        frames_1d[t] = cached[cached.index >= pd.Timestamp(start_days[t])]
+                        del fetch_starts[t]
+                    else:
+                        # Bars before the last cached one are final; refetch only the tail.
+                        cached_1d[t] = cached
+                        fetch_starts[t] = max(start_days[t], cached.index.max().date())
+                LOGGER.info(
+                    "1d cache dir=%s fresh=%s settled=%s tail_only=%s last_settled_session=%s",
+                    cache_dir,
+                    len(tickers) - len(fetch_starts),
+                    settled_count,
+                    len(cached_1d),
+                    settled_day,
+                )
+
+            # Tickers that share a start date are fetched together, at most
+            # download_batch_size symbols per yf.download call.
+            start_groups: dict[date, list[str]] = {}
+            for t, fetch_start in fetch_starts.items():
+                start_groups.setdefault(fetch_start, []).append(t)
+            batches_1d = [
+                (start_day, group[i : i + download_batch_size])
+                for start_day, group in start_groups.items()
+                for i in range(0, len(group), download_batch_size)
+            ]
+            batches_1m = (
+                [tickers[i : i + download_batch_size] for i in range(0, len(tickers), download_batch_size)]
+                if intraday_enabled
+                else []
+            )
+            # Without a session, every yf.download call opens a fresh one and redoes the TLS
+            # handshakes and Yahoo cookie/crumb lookup. curl_cffi gives each worker thread
+            # its own handle on the shared session, so the batches can reuse it concurrently.
+            yf_session = curl_requests.Session(impersonate="chrome")
+            batch_kwargs = {
+                "session": yf_session,
+                "timeout_s": yfinance_timeout_s,
+                "retries": yfinance_retries,
+                "retry_backoff_s": yfinance_retry_backoff_s,
+            }
+            n_batches = len(batches_1d) + len(batches_1m)
+            workers = max(1, min(download_workers, n_batches))
+            LOGGER.info("downloading tickers batches=%s workers=%s", n_batches, workers)
+            # Batches are network-bound and independent, so they run on worker threads while
+            # this thread writes: each ticker is upserted as soon as the batches holding it
+            # are in, instead of after the whole download phase. Only this thread uses conn.
+            pool = ThreadPoolExecutor(max_workers=workers)
+            futures: dict[Future, tuple[dict[str, pd.DataFrame], list[str]]] = {}
+            for start_day, group in batches_1d:
+                future = pool.submit(
+                    download_ohlcv_batch, group, interval="1d", start=start_day.isoformat(), **batch_kwargs
+                )
+                futures[future] = (frames_1d, group)
+            for group in batches_1m:
+                future = pool.submit(download_ohlcv_batch, group, interval="1m", period=intraday_period, **batch_kwargs)
+                futures[future] = (frames_1m, group)
+            futures_by_ticker: dict[str, list[Future]] = {t: [] for t in tickers}
+            for future, (_, group) in futures.items():
+                for t in group:
+                    futures_by_ticker[t].append(future)
+            collected: set[Future] = set()
+            ensured_days: set[date] = set()
+
             for idx, t in enumerate(tickers, start=1):
                 ticker_started = monotonic()
+                pct = (idx / total_tickers) * 100.0 if total_tickers > 0 else 100.0
+                for future in futures_by_ticker[t]:
+                    if future in collected:
+                        continue
+                    collected.add(future)
+                    frames, group = futures[future]
+                    try:
+                        frames.update(future.result())
+                    except Exception as exc:
+                        LOGGER.error("batch download failed tickers=%s err=%s", len(group), repr(exc))
+                        for g in group:
+                            download_errors.setdefault(g, exc)
+                new_days: set[date] = set()
                 try:
-                    if daily_start_mode == "from_db":
-                        latest_dt = latest_1d_map.get(t)
-                        if latest_dt is None:
-                            start_day = fallback_start_bootstrap
-                        else:
-                            start_day = latest_dt - timedelta(days=daily_overlap_days)
-                    elif daily_start_mode == "from_db_global":
-                        if latest_1d_global is None:
-                            start_day = fallback_start_bootstrap
-                        else:
-                            start_day = latest_1d_global - timedelta(days=daily_overlap_days)
-                    else:
-                        start_day = fallback_start_fixed
-
-                    start_dt = start_day.isoformat()
-                    pct = (idx / total_tickers) * 100.0 if total_tickers > 0 else 100.0
-                    LOGGER.info("[%s/%s %.1f%%] ticker=%s start daily_start=%s", idx, total_tickers, pct, t, start_dt)
-                    LOGGER.info("[%s/%s] ticker=%s downloading 1d", idx, total_tickers, t)
-                    df1d = download_ohlcv(
-                        t,
-                        interval="1d",
-                        start=start_dt,
-                        timeout_s=yfinance_timeout_s,
-                        retries=yfinance_retries,
-                        retry_backoff_s=yfinance_retry_backoff_s,
-                    )
-                    df1d = normalize_ohlcv(df1d, t)
+                    if t in download_errors:
+                        raise RuntimeError(f"download failed for ticker={t}") from download_errors[t]
+                    if cache_dir and t in fetch_starts:
+                        full = merge_cached_1d(cached_1d.get(t), frames_1d.get(t), fetch_starts[t])
+                        if full is not None and not full.empty:
+                            write_cached_1d(cache_dir, t, full)
+                            frames_1d[t] = full[full.index >= pd.Timestamp(start_days[t])]
+                    df1d = frames_1d.get(t)
+                    df1m = frames_1m.get(t)
+                    LOGGER.info("[%s/%s %.1f%%] ticker=%s start daily_start=%s", idx, total_tickers, pct, t, start_days[t])
                     daily_rows_official = 0 if df1d is None else len(df1d)
                     LOGGER.info(
                         "[%s/%s] ticker=%s upserting 1d rows=%s",
@@ -540,79 +946,78 @@ def main() -> int:
                         t,
                         daily_rows_official,
                     )
-                    upsert_1d(conn, t, df1d)
-
-                    intraday_rows = 0
-                    daily_rows_provisional = 0
-                    if intraday_enabled:
-                        LOGGER.info(
-                            "[%s/%s] ticker=%s downloading 1m period=%s",
-                            idx,
-                            total_tickers,
-                            t,
-                            intraday_period,
-                        )
-                        df1m = download_ohlcv(
-                            t,
-                            interval="1m",
-                            period=intraday_period,
-                            timeout_s=yfinance_timeout_s,
-                            retries=yfinance_retries,
-                            retry_backoff_s=yfinance_retry_backoff_s,
-                        )
-                        df1m = normalize_ohlcv(df1m, t)
-                        intraday_rows = 0 if df1m is None else len(df1m)
+                    # Small frames take the single-statement upsert path, so the ticker's
+                    # statements and its commit can go out behind one sync. COPY (large
+                    # backfills) cannot run in a pipeline, so those keep separate round-trips.
+                    pipelined = all(
+                        f is None or len(f) <= DIRECT_UPSERT_MAX_ROWS
+                        for f in (df1d, df1m if intraday_enabled else None)
+                    )
+                    with conn.pipeline() if pipelined else nullcontext():
+                        upsert_1d(conn, t, df1d)
+
+                        intraday_rows = 0
+                        daily_rows_provisional = 0
+                        if intraday_enabled:
+                            intraday_rows = 0 if df1m is None else len(df1m)
+                            LOGGER.info(
+                                "[%s/%s] ticker=%s upserting 1m rows=%s",
+                                idx,
+                                total_tickers,
+                                t,
+                                intraday_rows,
+                            )
+                            if partitioned_1m and df1m is not None and not df1m.empty:
+                                # Partitions are created in this ticker's transaction, so only
+                                # count them as ensured once it commits.
+                                new_days = utc_days(df1m.index) - ensured_days
+                                ensure_1m_partitions(conn, new_days)
+                            upsert_1m(conn, t, df1m)
+                            if promote_intraday_to_1d:
+                                provisional_1d = build_daily_from_intraday(df1m, market_timezone)
+                                provisional_rows = select_provisional_rows(df1d, provisional_1d)
+                                daily_rows_provisional = 0 if provisional_rows is None else len(provisional_rows)
+                                if daily_rows_provisional > 0:
+                                    LOGGER.info(
+                                        "[%s/%s] ticker=%s upserting provisional 1d rows from 1m rows=%s tz=%s",
+                                        idx,
+                                        total_tickers,
+                                        t,
+                                        daily_rows_provisional,
+                                        market_timezone,
+                                    )
+                                    upsert_1d(conn, t, provisional_rows)
+
+                        LOGGER.info("[%s/%s] ticker=%s committing transaction", idx, total_tickers, t)
+                        conn.commit()
+                    ensured_days |= new_days
+                    success_count += 1
+                    # The timing/ETA figures only feed this INFO line; skip them on quieter runs.
+                    if LOGGER.isEnabledFor(logging.INFO):
+                        ticker_elapsed = monotonic() - ticker_started
+                        run_elapsed = monotonic() - run_started
+                        avg_per_ticker = run_elapsed / idx if idx > 0 else 0.0
+                        eta_seconds = avg_per_ticker * (total_tickers - idx)
                         LOGGER.info(
-                            "[%s/%s] ticker=%s upserting 1m rows=%s",
+                            "[%s/%s %.1f%%] ticker=%s done daily_start=%s daily_rows_official=%s daily_rows_provisional=%s intraday_rows=%s "
+                            "ticker_elapsed=%.1fs run_elapsed=%.1fs eta=%.1fs",
                             idx,
                             total_tickers,
+                            pct,
                             t,
+                            start_days[t],
+                            daily_rows_official,
+                            daily_rows_provisional,
                             intraday_rows,
+                            ticker_elapsed,
+                            run_elapsed,
+                            eta_seconds,
                         )
-                        upsert_1m(conn, t, df1m)
-                        if promote_intraday_to_1d:
-                            provisional_1d = build_daily_from_intraday(df1m, market_timezone)
-                            provisional_rows = select_provisional_rows(df1d, provisional_1d)
-                            daily_rows_provisional = 0 if provisional_rows is None else len(provisional_rows)
-                            if daily_rows_provisional > 0:
-                                LOGGER.info(
-                                    "[%s/%s] ticker=%s upserting provisional 1d rows from 1m rows=%s tz=%s",
-                                    idx,
-                                    total_tickers,
-                                    t,
-                                    daily_rows_provisional,
-                                    market_timezone,
-                                )
-                                upsert_1d(conn, t, provisional_rows)
-
-                    LOGGER.info("[%s/%s] ticker=%s committing transaction", idx, total_tickers, t)
-                    conn.commit()
-                    success_count += 1
-                    ticker_elapsed = monotonic() - ticker_started
-                    run_elapsed = monotonic() - run_started
-                    avg_per_ticker = run_elapsed / idx if idx > 0 else 0.0
-                    eta_seconds = avg_per_ticker * (total_tickers - idx)
-                    LOGGER.info(
-                        "[%s/%s %.1f%%] ticker=%s done daily_start=%s daily_rows_official=%s daily_rows_provisional=%s intraday_rows=%s "
-                        "ticker_elapsed=%.1fs run_elapsed=%.1fs eta=%.1fs",
-                        idx,
-                        total_tickers,
-                        pct,
-                        t,
-                        start_dt,
-                        daily_rows_official,
-                        daily_rows_provisional,
-                        intraday_rows,
-                        ticker_elapsed,
-                        run_elapsed,
-                        eta_seconds,
-                    )
                 except Exception:
                     conn.rollback()
                     failed_tickers.append(t)
                     ticker_elapsed = monotonic() - ticker_started
                     run_elapsed = monotonic() - run_started
-                    pct = (idx / total_tickers) * 100.0 if total_tickers > 0 else 100.0
                     LOGGER.error(
                         "[%s/%s %.1f%%] ticker=%s failed ticker_elapsed=%.1fs run_elapsed=%.1fs",
                         idx,
@@ -624,6 +1029,9 @@ def main() -> int:
                     )
                     LOGGER.exception("failed updating ticker=%s", t)
 
+            pool.shutdown()
+            yf_session.close()
+
             if intraday_enabled and not intraday_truncate_before_load:
                 try:
                     cleanup_1m(conn, keep_1m)